@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+SMD Index: persistent inverted index over docs/ for instant search.
+Terms and headings are extracted through the SMD render path once;
+searches only read the JSON index and never re-parse Markdown.
+"""
+
+import argparse
+import bisect
+import json
+import math
+import re
+import sys
+import time
+from pathlib import Path
+
+from smd_preview import md_to_text
+
+INDEX_VERSION = 1
+INDEX_NAME = ".smd_index.json"
+DEFAULT_DOCS = Path(__file__).resolve().parents[3] / "docs"
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+FENCE_RE = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+ATX_RE = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+SETEXT_RE = re.compile(r"^\s{0,3}(=+|-+)\s*$")
+CONTAINER_RE = re.compile(r"^\s{0,3}([-+*]|\d+[.)])(\s|$)|^\s{0,3}>")
+HEADING_BONUS = 3.0
+
+
+def tokenize(text):
+    """Lower-case word tokens, single characters dropped."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+def _closes_fence(raw, fence):
+    """True if `raw` closes a fence opened with `fence` (same char, at least as long)."""
+    stripped = raw.strip()
+    return (len(raw) - len(raw.lstrip()) <= 3 and len(stripped) >= len(fence)
+            and stripped == fence[0] * len(stripped))
+
+
+def scan_file(path):
+    """Extract headings and term postings (1-based line numbers) from a Markdown file.
+
+    Paragraph-level blocks are rendered whole through the SMD path, so text the
+    renderer hides (HTML comments, reference definitions) is not indexed; the
+    rendered terms are then mapped back to the source lines they appear on.
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as file:
+        lines = file.read().splitlines()
+
+    headings = []
+    postings = {}
+
+    def add(line_no, terms):
+        for term in terms:
+            hits = postings.setdefault(term, [])
+            if not hits or hits[-1] != line_no:
+                hits.append(line_no)
+
+    def flush(block):
+        if not block:
+            return
+        rendered = set(tokenize(md_to_text("\n".join(raw for _, raw in block))))
+        placed = set()
+        for line_no, raw in block:
+            terms = [t for t in tokenize(raw) if t in rendered]
+            add(line_no, terms)
+            placed.update(terms)
+        # Terms produced by rendering alone (entities etc.) go to the block start
+        add(block[0][0], sorted(rendered - placed))
+        block.clear()
+
+    def heading(line_no, level, source):
+        # Rendered as a heading so "1. Intro" is not read as a list item; the
+        # explicit closing hashes keep a trailing "#" in the text ("C#")
+        marker = "#" * level
+        text = md_to_text(f"{marker} {source} {marker}").strip()
+        headings.append([line_no, level, text])
+        add(line_no, tokenize(text))
+
+    block = []
+    fence = None
+    in_comment = False
+    skip_underline = False
+    start = 0
+    if lines and lines[0].strip() == "---":
+        # YAML front matter is indexed as plain text, never as headings
+        for end in range(1, len(lines)):
+            if lines[end].strip() in ("---", "..."):
+                for j in range(1, end):
+                    add(j + 1, tokenize(lines[j]))
+                start = end + 1
+                break
+
+    for i in range(start, len(lines)):
+        raw = lines[i]
+        line_no = i + 1
+        if fence:
+            if _closes_fence(raw, fence):
+                fence = None
+            else:
+                # Code is indexed verbatim, as the renderer would show it
+                add(line_no, tokenize(raw))
+            continue
+        if in_comment:
+            # Keep the whole comment in one block so the renderer drops it
+            block.append((line_no, raw))
+            in_comment = "-->" not in raw
+            continue
+        if skip_underline:
+            skip_underline = False
+            continue
+        if not raw.strip():
+            flush(block)
+            continue
+
+        opening = FENCE_RE.match(raw)
+        if opening:
+            flush(block)
+            fence = opening.group(1)
+            continue
+
+        atx = ATX_RE.match(raw)
+        if atx:
+            flush(block)
+            heading(line_no, len(atx.group(1)), atx.group(2))
+            continue
+
+        if SETEXT_RE.match(raw):
+            # Thematic break (or an underline after a list/quote): ends the block
+            flush(block)
+            continue
+
+        nxt = lines[i + 1] if i + 1 < len(lines) else ""
+        para = block + [(line_no, raw)]
+        if SETEXT_RE.match(nxt) and not CONTAINER_RE.match(para[0][1]):
+            # The whole paragraph above the underline is the heading
+            block.clear()
+            level = 1 if nxt.strip()[0] == "=" else 2
+            heading(para[0][0], level, " ".join(r.strip() for _, r in para))
+            skip_underline = True
+            continue
+
+        block.append((line_no, raw))
+        in_comment = raw.rfind("<!--") > raw.rfind("-->")
+
+    flush(block)
+    return {"headings": headings, "postings": postings}
+
+
+def index_path_for(docs_dir):
+    return Path(docs_dir) / INDEX_NAME
+
+
+def _empty_index():
+    return {"version": INDEX_VERSION, "files": {}}
+
+
+def _valid_entry(entry):
+    if not (isinstance(entry, dict)
+            and isinstance(entry.get("headings"), list)
+            and isinstance(entry.get("postings"), dict)
+            and isinstance(entry.get("mtime"), int)
+            and isinstance(entry.get("size"), int)):
+        return False
+    for item in entry["headings"]:
+        if not (isinstance(item, list) and len(item) == 3 and isinstance(item[0], int)
+                and isinstance(item[1], int) and isinstance(item[2], str)):
+            return False
+    return all(isinstance(lines, list) and all(isinstance(n, int) for n in lines)
+               for lines in entry["postings"].values())
+
+
+def read_index(index_path):
+    """Load an index file, returning None if it is missing, stale or malformed."""
+    try:
+        with open(index_path, 'r', encoding='utf-8') as file:
+            index = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return None
+    files = index.get("files")
+    if not isinstance(files, dict) or not all(_valid_entry(e) for e in files.values()):
+        return None
+    return index
+
+
+def load_index(index_path):
+    """Load an index file, returning an empty index if missing, stale or malformed."""
+    return read_index(index_path) or _empty_index()
+
+
+def save_index(index, index_path):
+    tmp = Path(str(index_path) + ".tmp")
+    try:
+        with open(tmp, 'w', encoding='utf-8') as file:
+            json.dump(index, file, ensure_ascii=False, separators=(",", ":"))
+        tmp.replace(index_path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _doc_files(docs_dir):
+    docs_dir = Path(docs_dir)
+    for path in sorted(docs_dir.rglob("*.md")):
+        yield path.relative_to(docs_dir).as_posix(), path
+
+
+def _is_current(entry, st):
+    return entry is not None and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size
+
+
+def stale_files(index, docs_dir=DEFAULT_DOCS):
+    """List files changed, added or removed since the index was built (stat only).
+
+    Returns (changed, added, removed) lists of relative paths.
+    """
+    files = index["files"]
+    changed, added, seen = [], [], set()
+    for rel, path in _doc_files(docs_dir):
+        seen.add(rel)
+        if rel not in files:
+            added.append(rel)
+        elif not _is_current(files[rel], path.stat()):
+            changed.append(rel)
+    removed = [rel for rel in files if rel not in seen]
+    return changed, added, removed
+
+
+def update_index(docs_dir=DEFAULT_DOCS, index_path=None):
+    """Bring the index up to date, re-scanning only files whose mtime/size changed.
+
+    Returns (index, updated, removed) where the last two are lists of relative paths.
+    """
+    docs_dir = Path(docs_dir)
+    index_path = index_path or index_path_for(docs_dir)
+    index = load_index(index_path)
+    files = index["files"]
+
+    seen = set()
+    updated = []
+    for rel, path in _doc_files(docs_dir):
+        seen.add(rel)
+        st = path.stat()
+        if _is_current(files.get(rel), st):
+            continue
+        entry = scan_file(path)
+        entry["mtime"] = st.st_mtime_ns
+        entry["size"] = st.st_size
+        files[rel] = entry
+        updated.append(rel)
+
+    removed = [rel for rel in files if rel not in seen]
+    for rel in removed:
+        del files[rel]
+
+    if updated or removed or not Path(index_path).exists():
+        save_index(index, index_path)
+    return index, updated, removed
+
+
+def search(index, query, limit=10):
+    """Rank heading-anchored sections matching the query terms.
+
+    Each hit is attributed to the nearest preceding heading; sections are
+    scored by tf-idf over files, scaled by the fraction of query terms matched.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    files = index["files"]
+    if not terms or not files:
+        return []
+
+    n_files = len(files)
+    idf = {}
+    for term in terms:
+        df = sum(1 for entry in files.values() if term in entry["postings"])
+        idf[term] = math.log(1 + n_files / df) if df else 0.0
+
+    results = []
+    for rel, entry in files.items():
+        headings = entry["headings"]
+        starts = [h[0] for h in headings]
+        sections = {}
+        for term in terms:
+            for line_no in entry["postings"].get(term, ()):
+                slot = bisect.bisect_right(starts, line_no) - 1
+                hits = sections.setdefault(slot, {})
+                hits.setdefault(term, []).append(line_no)
+
+        for slot, hits in sections.items():
+            heading = headings[slot] if slot >= 0 else None
+            score = 0.0
+            for term, lines in hits.items():
+                score += idf[term] * (1 + math.log(len(lines)))
+                if heading and heading[0] in lines:
+                    score += idf[term] * HEADING_BONUS
+            score *= len(hits) / len(terms)
+            hit_lines = sorted({n for lines in hits.values() for n in lines})
+            results.append({
+                "file": rel,
+                "line": heading[0] if heading else hit_lines[0],
+                "level": heading[1] if heading else 0,
+                "heading": heading[2] if heading else "",
+                "score": score,
+                "lines": hit_lines,
+            })
+
+    results.sort(key=lambda r: (-r["score"], r["file"], r["line"]))
+    return results[:limit]
+
+
+def format_result(result):
+    anchor = ("#" * result["level"] + " " + result["heading"]) if result["level"] else "(preamble)"
+    shown = ", ".join(str(n) for n in result["lines"][:8])
+    if len(result["lines"]) > 8:
+        shown += ", …"
+    return (f"{result['score']:6.2f}  {result['file']}:{result['line']}  {anchor}\n"
+            f"        lines: {shown}")
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--docs", default=str(DEFAULT_DOCS), help="docs directory to index")
+    common.add_argument("--index", default=None, help="index file (default: <docs>/" + INDEX_NAME + ")")
+    parser = argparse.ArgumentParser(prog="smd", description="SMD docs index and search")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("index", parents=[common], help="build or refresh the index")
+    p_search = sub.add_parser("search", parents=[common], help="search the index")
+    p_search.add_argument("query", nargs="+")
+    p_search.add_argument("-n", "--limit", type=_positive_int, default=10)
+    args = parser.parse_args(argv)
+
+    docs_dir = Path(args.docs)
+    if not docs_dir.is_dir():
+        print(f"❌ Docs directory not found: {docs_dir}")
+        return 1
+
+    index_path = args.index or index_path_for(docs_dir)
+    start = time.perf_counter()
+    try:
+        if args.command == "index":
+            index, updated, removed = update_index(docs_dir, index_path)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"Indexed {len(index['files'])} files "
+                  f"({len(updated)} updated, {len(removed)} removed) in {elapsed:.0f} ms")
+            return 0
+
+        index = read_index(index_path)
+        if index is None:
+            print(f"❌ No usable index at {index_path} – run `python smd_preview.py index` first")
+            return 1
+        changed, added, removed = stale_files(index, docs_dir)
+        results = search(index, " ".join(args.query), args.limit)
+    except OSError as e:
+        print(f"❌ SMD index error: {e}")
+        return 1
+
+    elapsed = (time.perf_counter() - start) * 1000
+    for result in results:
+        print(format_result(result))
+    print(f"{len(results)} result(s) in {elapsed:.1f} ms")
+    if changed or added or removed:
+        print(f"⚠️  Index is stale ({len(changed)} changed, {len(added)} new, "
+              f"{len(removed)} removed) – run `python smd_preview.py index` to refresh")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,21 +6,27 @@ Integrates with docs/ files – run after editing.
 
 import sys
 import markdown
-from markdown.extensions import extra, fenced_code
 from bs4 import BeautifulSoup
 
+# Shared converter; extensions by name so newer Markdown releases accept them
+_md = markdown.Markdown(extensions=['extra', 'fenced_code'])
+
+def md_to_text(md_content):
+    """Convert a Markdown string to plain text (the SMD render path)."""
+    # Convert to HTML
+    html_content = _md.reset().convert(md_content)
+
+    # Strip to plain text
+    soup = BeautifulSoup(html_content, 'html.parser')
+    return soup.get_text()
+
 def shell_md(file_path):
     """Render Markdown as plain text in terminal."""
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
             md_content = file.read()
 
-        # Convert to HTML
-        html_content = markdown.markdown(md_content, extensions=[extra, fenced_code])
-
-        # Strip to plain text
-        soup = BeautifulSoup(html_content, 'html.parser')
-        plain_text = soup.get_text()
+        plain_text = md_to_text(md_content)
 
         # Print with simple formatting
         print("\n" + "="*60)
@@ -36,5 +42,10 @@ def shell_md(file_path):
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python smd_preview.py <file.md>")
+        print("       python smd_preview.py index [--docs DIR]")
+        print("       python smd_preview.py search <query> [--docs DIR] [-n N]")
         sys.exit(1)
+    if sys.argv[1] in ("index", "search"):
+        from smd_index import main
+        sys.exit(main(sys.argv[1:]))
     shell_md(sys.argv[1])
@@ -0,0 +1,160 @@
+"""Tests for the SMD docs index (needs markdown and beautifulsoup4)."""
+
+import os
+
+import pytest
+
+pytest.importorskip("markdown")
+pytest.importorskip("bs4")
+
+import smd_index  # noqa: E402
+
+
+DOC = """\
+# Charset Normalizer #
+
+Intro about unicode normalisation.
+
+Actor Model
+===========
+
+Actors exchange messages.
+<!-- hidden
+comment words -->
+
+## C#
+
+````md
+```
+fenced inner
+```
+````
+
+Sub Section
+-----------
+
+Closing text about actors.
+
+## 1. Introduction
+
+Wrapped setext
+heading text
+------------
+
+- list item
+---
+"""
+
+
+def write(path, text, mtime=None):
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def test_scan_headings_and_fences(tmp_path):
+    doc = tmp_path / "spec.md"
+    write(doc, DOC)
+    entry = smd_index.scan_file(doc)
+
+    assert entry["headings"] == [
+        [1, 1, "Charset Normalizer"],
+        [5, 1, "Actor Model"],
+        [12, 2, "C#"],
+        [20, 2, "Sub Section"],
+        [25, 2, "1. Introduction"],
+        [27, 2, "Wrapped setext heading text"],
+    ]
+    postings = entry["postings"]
+    assert postings["unicode"] == [3]
+    assert postings["messages"] == [8]
+    assert postings["fenced"] == [16]
+    assert postings["inner"] == [16]
+    assert postings["actors"] == [8, 23]
+    assert postings["item"] == [31]
+    assert "hidden" not in postings
+    assert "comment" not in postings
+
+
+def test_scan_front_matter(tmp_path):
+    doc = tmp_path / "front.md"
+    write(doc, "---\ntitle: Foo\n---\n\nBody text\n")
+    entry = smd_index.scan_file(doc)
+
+    assert entry["headings"] == []
+    assert entry["postings"]["title"] == [2]
+    assert entry["postings"]["body"] == [5]
+
+
+def test_update_index_refresh(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    write(docs / "a.md", "# Alpha\n\nfirst\n", mtime=1_000_000_000)
+    write(docs / "b.md", "# Beta\n\nsecond\n", mtime=1_000_000_000)
+
+    index, updated, removed = smd_index.update_index(docs)
+    assert updated == ["a.md", "b.md"] and removed == []
+    assert (docs / smd_index.INDEX_NAME).exists()
+
+    index, updated, removed = smd_index.update_index(docs)
+    assert updated == [] and removed == []
+
+    write(docs / "a.md", "# Alpha\n\nchanged\n", mtime=2_000_000_000)
+    (docs / "b.md").unlink()
+    assert smd_index.stale_files(index, docs) == (["a.md"], [], ["b.md"])
+
+    index, updated, removed = smd_index.update_index(docs)
+    assert updated == ["a.md"] and removed == ["b.md"]
+    assert sorted(index["files"]) == ["a.md"]
+    assert "changed" in index["files"]["a.md"]["postings"]
+    assert smd_index.stale_files(index, docs) == ([], [], [])
+
+
+def test_load_index_malformed(tmp_path):
+    path = tmp_path / "index.json"
+    entry = '"mtime": 1, "size": 1'
+    for text in (
+        "[]",
+        '{"version": 1, "files": []}',
+        '{"version": 1, "files": {"a.md": []}}',
+        '{"version": 1, "files": {"a.md": {"headings": [5], "postings": {}, %s}}}' % entry,
+        '{"version": 1, "files": {"a.md": {"headings": [], "postings": {"actor": 5}, %s}}}' % entry,
+    ):
+        path.write_text(text, encoding="utf-8")
+        assert smd_index.read_index(path) is None
+        assert smd_index.load_index(path) == {"version": smd_index.INDEX_VERSION, "files": {}}
+
+
+def test_main_search_messages(tmp_path, capsys):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    assert smd_index.main(["search", "--docs", str(docs), "actor"]) == 1
+    assert "No usable index" in capsys.readouterr().out
+
+    assert smd_index.main(["index", "--docs", str(docs)]) == 0
+    capsys.readouterr()
+    assert smd_index.main(["search", "--docs", str(docs), "actor"]) == 0
+    assert "0 result(s)" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        smd_index.main(["search", "--docs", str(docs), "-n", "0", "actor"])
+
+
+def test_search_ranking(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    write(docs / "spec.md", DOC)
+    write(docs / "other.md", "# Notes\n\nOne actor here.\n\n# Actors\n\nactors actors\n")
+    index, _, _ = smd_index.update_index(docs)
+
+    results = smd_index.search(index, "actors")
+    assert [(r["file"], r["heading"]) for r in results] == [
+        ("other.md", "Actors"),
+        ("spec.md", "Actor Model"),
+        ("spec.md", "Sub Section"),
+    ]
+    assert results[0]["lines"] == [5, 7]
+
+    results = smd_index.search(index, "unicode actors", limit=1)
+    assert len(results) == 1
+    assert smd_index.search(index, "nonexistentterm") == []